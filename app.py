@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
+
+from data import AGE_GROUPS, ISLANDS, load_data, region_rows
 
 # --- PAGE CONFIG ---
 st.set_page_config(
@@ -10,7 +14,9 @@ st.set_page_config(
 )
 
 # --- ADAPTIVE CSS STYLING ---
-st.markdown("""
+# Emitted on every rerun: Streamlit drops elements a rerun does not redraw, so skipping
+# this after the first run of a session would strip the styling from the page
+CSS = """
     <style>
         /* 1. Metric Cards - Adaptive Styling */
         div[data-testid="stMetric"] {
@@ -44,52 +50,12 @@ st.markdown("""
             background-color: transparent;
         }
     </style>
-""", unsafe_allow_html=True)
+"""
+st.markdown(CSS, unsafe_allow_html=True)
 
 # --- DATA PROCESSING ---
-@st.cache_data
-def load_data():
-    # --- TABLE 19 (GEOGRAPHY) ---
-    df_geo = pd.read_csv('table19.csv', header=2, usecols=range(11))
-    df_geo.columns = ['Place', 'Total', 'Under 15', '15-19', '20-24', '25-29', '30-34', '35-39', '40-44', '45-49', '50+']
-    df_geo = df_geo.dropna(subset=['Place'])
-    
-    # Island Groups
-    def get_island_group(place):
-        place = str(place).upper()
-        if any(x in place for x in ['NCR', 'CAR', 'REGION I', 'REGION II', 'REGION III', 'REGION IV', 'MIMAROPA', 'REGION V']):
-            return 'Luzon'
-        elif any(x in place for x in ['REGION VI', 'REGION VII', 'REGION VIII']):
-            return 'Visayas'
-        elif any(x in place for x in ['REGION IX', 'REGION X', 'REGION XI', 'REGION XII', 'CARAGA', 'BARMM']):
-            return 'Mindanao'
-        return 'Other'
-
-    df_geo['Island Group'] = df_geo['Place'].apply(get_island_group)
-    df_geo['IsRegion'] = df_geo['Place'].apply(lambda x: "REGION" in str(x) or "NCR" in str(x) or "CAR" in str(x) or "BARMM" in str(x))
-
-    # Melt
-    df_geo_long = df_geo.melt(id_vars=['Place', 'IsRegion', 'Island Group'], 
-                              value_vars=['Under 15', '15-19', '20-24', '25-29', '30-34', '35-39', '40-44', '45-49', '50+'],
-                              var_name='Age Group', value_name='Deaths')
-    df_geo_long['Deaths'] = pd.to_numeric(df_geo_long['Deaths'], errors='coerce').fillna(0)
-
-    # --- TABLE 20 (CAUSES) ---
-    df_cause = pd.read_csv('table20.csv', header=1, usecols=range(12))
-    df_cause.columns = ['ICD Code', 'Cause', 'Total', 'Under 15', '15-19', '20-24', '25-29', '30-34', '35-39', '40-44', '45-49', '50+']
-    df_cause = df_cause.dropna(subset=['ICD Code'])
-    df_cause = df_cause[df_cause['ICD Code'] != 'ICD-10 Code'] 
-    
-    # Melt
-    df_cause_long = df_cause.melt(id_vars=['ICD Code', 'Cause'], 
-                                  value_vars=['Under 15', '15-19', '20-24', '25-29', '30-34', '35-39', '40-44', '45-49', '50+'],
-                                  var_name='Age Group', value_name='Deaths')
-    df_cause_long['Deaths'] = pd.to_numeric(df_cause_long['Deaths'], errors='coerce').fillna(0)
-    
-    return df_geo_long, df_cause_long
-
 try:
-    df_geo, df_cause = load_data()
+    geo_pivot, cause_pivot = load_data()
 except Exception as e:
     st.error(f"❌ Data Error: {e}")
     st.stop()
@@ -98,47 +64,193 @@ except Exception as e:
 with st.sidebar:
     st.title("📊 Filter Data")
     
-    # Complication Filter 
-    # Get unique list of causes from the data, sorted alphabetically
-    unique_causes = sorted(df_cause['Cause'].astype(str).unique())
+    # Filters are applied together on submit, so picking options doesn't rerun the whole dashboard
+    with st.form("filters"):
+        # Complication Filter 
+        # Get unique list of causes from the data, sorted alphabetically
+        unique_causes = sorted(cause_pivot.index.get_level_values('Cause').unique())
     
-    selected_complications = st.multiselect(
-        "Select Specific Complication(s):", 
-        options=unique_causes,
-        placeholder="Type to search or select..."
-    )
+        selected_complications = st.multiselect(
+            "Select Specific Complication(s):", 
+            options=unique_causes,
+            placeholder="Type to search or select..."
+        )
 
-    #  Age Filter
-    selected_age = st.multiselect(
-        "Filter by Age Group:", 
-        options=df_cause['Age Group'].unique(), 
-        default=['20-24', '25-29', '30-34', '35-39']
-    )
-    
-    st.markdown("---")
-    
-    # Island Filter
-    island_options = ['Luzon', 'Visayas', 'Mindanao']
-    selected_island = st.multiselect("Region / Island Group:", island_options, default=island_options)
+        #  Age Filter
+        selected_age = st.multiselect(
+            "Filter by Age Group:", 
+            options=AGE_GROUPS, 
+            default=['20-24', '25-29', '30-34', '35-39']
+        )
     
-    st.markdown("---")
+        st.markdown("---")
     
+        # Island Filter
+        selected_island = st.multiselect("Region / Island Group:", ISLANDS, default=ISLANDS)
     
+        st.markdown("---")
+        st.form_submit_button("Apply Filters", use_container_width=True)
 
 # FILTER LOGIC
-if selected_age:
-    filtered_cause = df_cause[df_cause['Age Group'].isin(selected_age)]
-    filtered_geo = df_geo[df_geo['Age Group'].isin(selected_age)]
-else:
-    filtered_cause = df_cause
-    filtered_geo = df_geo
+# Filters are normalized to sorted tuples so identical selections share one cache entry
+def age_columns(age_key):
+    # An empty age selection means no age filter
+    return [age for age in AGE_GROUPS if age in age_key] if age_key else list(AGE_GROUPS)
+
+def level_mask(index, level, values):
+    # Compare the MultiIndex's integer level codes instead of hashing label strings
+    position = index.names.index(level)
+    selected = index.levels[position].get_indexer(list(values))
+    return np.isin(index.codes[position], selected[selected >= 0])
+
+def select_causes(cause_key):
+    cause_pivot = load_data()[1]
+    if cause_key:
+        cause_pivot = cause_pivot[level_mask(cause_pivot.index, 'Cause', cause_key)]
+    return cause_pivot
+
+@st.cache_data
+def filter_cause(age_key, cause_key):
+    return select_causes(cause_key)[age_columns(age_key)]
+
+@st.cache_data
+def filter_geo(age_key, island_key):
+    geo_pivot = load_data()[0]
+    if island_key:
+        geo_pivot = geo_pivot[level_mask(geo_pivot.index, 'Island Group', island_key)]
+    return geo_pivot[age_columns(age_key)]
+
+# --- CACHED AGGREGATIONS ---
+def age_mask(age_key):
+    # 0/1 weights aligned to the AGE_GROUPS columns, so a matrix-vector product
+    # gives every row's total over the selected ages
+    if not age_key:
+        return np.ones(len(AGE_GROUPS), dtype=np.int32)
+    return np.isin(AGE_GROUPS, age_key).astype(np.int32)
+
+def top_k(totals, k):
+    # Indices of the k largest totals in descending order, without sorting the rest
+    k = min(k, len(totals))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    idx = np.argpartition(-totals, k - 1)[:k]
+    return idx[np.argsort(-totals[idx], kind='stable')]
+
+@st.cache_data
+def cause_totals(age_key, cause_key):
+    cause_pivot = select_causes(cause_key)
+    return pd.Series(cause_pivot.to_numpy() @ age_mask(age_key),
+                     index=cause_pivot.index.get_level_values('Cause'), name='Deaths')
+
+@st.cache_data
+def top_causes(age_key, cause_key, k=10):
+    totals = cause_totals(age_key, cause_key)
+    return totals.iloc[top_k(totals.to_numpy(), k)]
+
+@st.cache_data
+def age_totals(age_key, cause_key):
+    return filter_cause(age_key, cause_key).sum().rename('Deaths')
+
+@st.cache_data
+def region_totals(age_key, island_key):
+    geo_pivot = load_data()[0]
+    rows = region_rows()
+    if island_key:
+        rows = rows[level_mask(geo_pivot.index, 'Island Group', island_key)[rows]]
+    totals = pd.Series(geo_pivot.to_numpy()[rows] @ age_mask(age_key),
+                       index=geo_pivot.index.get_level_values('Place')[rows], name='Deaths')
+    return totals.sort_values(ascending=False)
+
+@st.cache_data
+def leading_cause(age_key, cause_key):
+    # A single linear scan; no need to sort every cause to find the largest
+    return cause_totals(age_key, cause_key).idxmax()
+
+@st.cache_data
+def headline_metrics(age_key, island_key, cause_key):
+    total_deaths = int(cause_totals(age_key, cause_key).to_numpy().sum())
+    geo_deaths = int(region_totals(age_key, island_key).to_numpy().sum())
+    return total_deaths, geo_deaths
+
+age_key = tuple(sorted(selected_age))
+island_key = tuple(sorted(selected_island))
+cause_key = tuple(sorted(selected_complications))
+
+filtered_cause = filter_cause(age_key, cause_key)
+filtered_geo = filter_geo(age_key, island_key)
 
-if selected_island:
-    filtered_geo = filtered_geo[filtered_geo['Island Group'].isin(selected_island)]
+# --- FIGURES ---
+MAX_SVG_PLACES = 200
 
-# UPDATED LOGIC: Filter by Selected Complications if any are chosen
-if selected_complications:
-    filtered_cause = filtered_cause[filtered_cause['Cause'].isin(selected_complications)]
+# Base figures with the fixed styling; the cached builders below only fill in trace data
+def make_bar_fig():
+    fig = go.Figure(go.Bar(orientation='h', textposition='auto',
+                           marker=dict(colorscale='Reds', showscale=True, colorbar=dict(title='Deaths')),
+                           hovertemplate='Cause=%{y}<br>Deaths=%{x}<extra></extra>'))
+    fig.update_layout(
+        yaxis={'categoryorder':'total ascending', 'title': None},
+        xaxis={'title': 'Number of Deaths'},
+        margin=dict(l=0, r=0, t=10, b=0),
+        height=400,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=None)
+    )
+    return fig
+
+def make_pie_fig():
+    fig = go.Figure(go.Pie(hole=0.5, hovertemplate='Age Group=%{label}<br>Deaths=%{value}<extra></extra>'))
+    fig.update_layout(
+        piecolorway=px.colors.qualitative.Pastel,
+        legend=dict(orientation="h", yanchor="bottom", y=-0.3),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=400,
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=None)
+    )
+    return fig
+
+# cache_resource hands back the same figure object without the deep copy cache_data makes;
+# figures are never mutated after they are built, so sharing them between sessions is safe
+@st.cache_resource(max_entries=64)
+def build_bar_fig(age_key, cause_key):
+    cause_summary = top_causes(age_key, cause_key)
+    fig = make_bar_fig()
+    fig.data[0].update(x=cause_summary.values, y=cause_summary.index.astype(str),
+                       text=cause_summary.values, marker_color=cause_summary.values)
+    return fig
+
+@st.cache_resource(max_entries=64)
+def build_pie_fig(age_key, cause_key):
+    age_summary = age_totals(age_key, cause_key)
+    fig = make_pie_fig()
+    fig.data[0].update(values=age_summary.values, labels=age_summary.index)
+    return fig
+
+@st.cache_resource(max_entries=64)
+def build_map_fig(age_key, island_key):
+    geo_summary = region_totals(age_key, island_key)
+    if len(geo_summary) > MAX_SVG_PLACES:
+        # Too many SVG bars stall the browser; draw WebGL markers instead
+        fig = px.scatter(x=geo_summary.index.astype(str), y=geo_summary.values,
+                         color=geo_summary.values,
+                         color_continuous_scale='Teal',
+                         labels={'x': 'Region', 'y': 'Deaths', 'color': 'Deaths'},
+                         render_mode='webgl')
+    else:
+        fig = px.bar(x=geo_summary.index.astype(str), y=geo_summary.values, 
+                     color=geo_summary.values, 
+                     color_continuous_scale='Teal',
+                     labels={'x': 'Region', 'y': 'Deaths', 'color': 'Deaths'})
+    
+    fig.update_layout(
+        xaxis_tickangle=-45,
+        margin=dict(l=0, r=0, t=10, b=80),
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=None)
+    )
+    return fig
 
 # --- DASHBOARD UI ---
 
@@ -147,13 +259,11 @@ st.markdown("### *Analysis of Maternal Mortality Risks*")
 st.markdown("---")
 
 # --- METRICS ROW ---
-total_deaths = int(filtered_cause['Deaths'].sum())
-geo_deaths = int(filtered_geo[filtered_geo['IsRegion']]['Deaths'].sum())
+total_deaths, geo_deaths = headline_metrics(age_key, island_key, cause_key)
 
 # Calculate Leading Cause
 if not filtered_cause.empty:
-    top_cause_row = filtered_cause.groupby('Cause')['Deaths'].sum().reset_index().sort_values('Deaths', ascending=False).iloc[0]
-    full_cause_name = top_cause_row['Cause']
+    full_cause_name = leading_cause(age_key, cause_key)
     
     # TRUNCATE LOGIC
     if len(full_cause_name) > 22:
@@ -177,22 +287,7 @@ col_left, col_right = st.columns([2, 1])
 with col_left:
     st.subheader("🩺 Top 10 Complications")
     if not filtered_cause.empty:
-        cause_summary = filtered_cause.groupby('Cause')['Deaths'].sum().reset_index().sort_values('Deaths', ascending=False).head(10)
-        
-        fig_bar = px.bar(cause_summary, x='Deaths', y='Cause', orientation='h', 
-                         text='Deaths', 
-                         color='Deaths', 
-                         color_continuous_scale='Reds')
-        
-        fig_bar.update_layout(
-            yaxis={'categoryorder':'total ascending', 'title': None},
-            xaxis={'title': 'Number of Deaths'},
-            margin=dict(l=0, r=0, t=10, b=0),
-            height=400,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=None)
-        )
+        fig_bar = build_bar_fig(age_key, cause_key)
         st.plotly_chart(fig_bar, use_container_width=True)
     else:
         st.info("No data found for current filters.")
@@ -200,39 +295,15 @@ with col_left:
 with col_right:
     st.subheader("👥 Age Group Share")
     if not filtered_cause.empty:
-        age_summary = filtered_cause.groupby('Age Group')['Deaths'].sum().reset_index()
-        
-        fig_pie = px.pie(age_summary, values='Deaths', names='Age Group', hole=0.5,
-                         color_discrete_sequence=px.colors.qualitative.Pastel)
-        
-        fig_pie.update_layout(
-            legend=dict(orientation="h", yanchor="bottom", y=-0.3),
-            margin=dict(l=0, r=0, t=0, b=0),
-            height=400,
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=None)
-        )
+        fig_pie = build_pie_fig(age_key, cause_key)
         st.plotly_chart(fig_pie, use_container_width=True)
 
 # ROW 2 - MAP
 st.subheader("📍 Regional Analysis")
-regions_only = filtered_geo[filtered_geo['IsRegion'] == True]
+geo_summary = region_totals(age_key, island_key)
 
-if not regions_only.empty:
-    geo_summary = regions_only.groupby('Place')['Deaths'].sum().reset_index().sort_values('Deaths', ascending=False)
-    
-    fig_map = px.bar(geo_summary, x='Place', y='Deaths', 
-                     color='Deaths', 
-                     color_continuous_scale='Teal',
-                     labels={'Place': 'Region'})
-    
-    fig_map.update_layout(
-        xaxis_tickangle=-45,
-        margin=dict(l=0, r=0, t=10, b=80),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=None)
-    )
+if not geo_summary.empty:
+    fig_map = build_map_fig(age_key, island_key)
     st.plotly_chart(fig_map, use_container_width=True)
 else:
     st.warning("No regions match your filter.")
@@ -243,11 +314,11 @@ with st.expander("View Raw Data Tables", expanded=False):
     
     with tab1:
         st.write(f"Showing **{len(filtered_cause)}** records based on current filters.")
-        st.dataframe(filtered_cause, use_container_width=True)
+        st.dataframe(filtered_cause.reset_index(), use_container_width=True)
         
     with tab2:
         st.write(f"Showing **{len(filtered_geo)}** records based on current filters.")
-        st.dataframe(filtered_geo, use_container_width=True)
+        st.dataframe(filtered_geo.reset_index(), use_container_width=True)
 
 
 # --- FOOTER ---
@@ -0,0 +1,61 @@
+# One-shot build step: parse the PSA CSV exports into Parquet for app.py.
+# Run `python build_data.py` whenever table19.csv or table20.csv change.
+import re
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+from pyarrow import csv as pacsv
+
+from data import AGE_GROUPS, ISLANDS
+
+# Island group patterns; word boundaries keep e.g. REGION VI out of REGION V and CARAGA out of CAR
+LUZON_RE = re.compile(r'\bNCR\b|\bCAR\b|REGION (?:I{1,3}|IV|V)\b|MIMAROPA', re.I)
+VISAYAS_RE = re.compile(r'REGION VI{1,3}\b', re.I)
+MINDANAO_RE = re.compile(r'REGION (?:IX|XI{0,3})\b|CARAGA|BARMM', re.I)
+
+def read_table(path, skip_rows, columns):
+    # Arrow's CSV reader parses the age columns straight to int32; '-' marks zero deaths.
+    # The Total column is never used, so it is skipped without being converted.
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(skip_rows=skip_rows, column_names=columns + ['_trailing']),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={age: pa.int32() for age in AGE_GROUPS},
+            include_columns=[column for column in columns if column != 'Total'],
+            null_values=['', '-', ' - '],
+            strings_can_be_null=True
+        )
+    )
+    return table.to_pandas()
+
+def build_geo():
+    # --- TABLE 19 (GEOGRAPHY) ---
+    df_geo = read_table('table19.csv', 3, ['Place', 'Total', *AGE_GROUPS])
+    df_geo = df_geo.dropna(subset=['Place'])
+    
+    # Island Groups
+    place = df_geo['Place'].astype(str)
+    mask_luzon = place.str.contains(LUZON_RE)
+    mask_visayas = place.str.contains(VISAYAS_RE)
+    mask_mindanao = place.str.contains(MINDANAO_RE)
+    df_geo['Island Group'] = pd.Categorical(np.select([mask_luzon, mask_visayas, mask_mindanao],
+                                                      list(ISLANDS), default='Other'),
+                                            categories=[*ISLANDS, 'Other'])
+    df_geo['IsRegion'] = place.str.contains(r'REGION|NCR|CAR|BARMM')
+
+    # Kept wide (one row per place, one int32 column per age group):
+    # filtering by age is a column selection and no groupby is needed to undo a melt
+    return df_geo.set_index(['Place', 'Island Group', 'IsRegion'])[list(AGE_GROUPS)].fillna(0).astype('int32')
+
+def build_cause():
+    # --- TABLE 20 (CAUSES) ---
+    df_cause = read_table('table20.csv', 2, ['ICD Code', 'Cause', 'Total', *AGE_GROUPS])
+    # Footnote rows carry text in the ICD column but no cause
+    df_cause = df_cause.dropna(subset=['ICD Code', 'Cause'])
+    return df_cause.set_index(['ICD Code', 'Cause'])[list(AGE_GROUPS)].fillna(0).astype('int32')
+
+if __name__ == '__main__':
+    build_geo().to_parquet('table19.parquet')
+    build_cause().to_parquet('table20.parquet')
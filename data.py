@@ -0,0 +1,21 @@
+# Shared data schema and loader, imported by every dashboard page so they share one cache entry.
+import streamlit as st
+import pandas as pd
+import numpy as np
+
+# Fixed by the PSA table schema, so the sidebar options never need a pass over the data
+AGE_GROUPS = ('Under 15', '15-19', '20-24', '25-29', '30-34', '35-39', '40-44', '45-49', '50+')
+ISLANDS = ('Luzon', 'Visayas', 'Mindanao')
+
+@st.cache_data
+def load_data():
+    # Prebuilt by build_data.py; Parquet keeps the int32 counts and categorical index on disk
+    geo_pivot = pd.read_parquet('table19.parquet')
+    cause_pivot = pd.read_parquet('table20.parquet')
+    return geo_pivot, cause_pivot
+
+@st.cache_data
+def region_rows():
+    # Positions of region-level rows in the geography table; provinces and cities are skipped
+    geo_pivot = load_data()[0]
+    return np.flatnonzero(geo_pivot.index.get_level_values('IsRegion'))